@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""Validate a Claude Code hook configuration (settings.json / hooks.json).
+
+Checks JSON syntax, event names, matcher/hook structure, command paths,
+obviously dangerous commands, and Stop-hook loop guards. Exits non-zero
+when any error-level issue is found; warnings and info notes are printed
+but do not fail the run.
+
+Usage: bin/validate-hook-config.py <path/to/settings.json>...
+       bin/validate-hook-config.py --glob 'plugins/*/hooks/hooks.json'
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # optional — 3-5x faster parse for the non-streaming path
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:  # optional — only needed for the large-file streaming path
+    ijson = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional — single-pass keyword scan, falls back to `in`
+    ahocorasick = None
+
+VALID_EVENTS = frozenset({
+    "PreToolUse",
+    "PostToolUse",
+    "UserPromptSubmit",
+    "Notification",
+    "Stop",
+    "SubagentStop",
+    "PreCompact",
+    "SessionStart",
+    "SessionEnd",
+})
+
+# Events whose matcher objects take a "matcher" pattern vs. those that
+# ignore it entirely.
+MATCHER_REQUIRED = frozenset({"PreToolUse", "PostToolUse", "PreCompact"})
+NO_MATCHER = VALID_EVENTS - MATCHER_REQUIRED
+
+VALID_TYPES = frozenset({"command"})
+
+STOP_EVENTS = frozenset({"Stop", "SubagentStop"})
+
+# Pre-rendered lists for error messages, so the formatter doesn't sort
+# and join on every bad event/type it reports.
+_VALID_EVENTS_STR = ", ".join(sorted(VALID_EVENTS))
+_VALID_TYPES_STR = ", ".join(sorted(VALID_TYPES))
+
+_REL_PREFIXES = ("./", "../")
+
+# Every substring predicate the per-command rules need, tagged so one
+# scan of the command classifies it for all of them. The env vars appear
+# in both $VAR and ${VAR} spelling (plugin hooks.json files use braces).
+_COMMAND_KEYWORDS: Tuple[Tuple[str, str], ...] = (
+    ("stop_guard", "stop_hook_active"),
+    ("env", "$CLAUDE_PROJECT_DIR"),
+    ("env", "${CLAUDE_PROJECT_DIR}"),
+    ("env", "$CLAUDE_PLUGIN_ROOT"),
+    ("env", "${CLAUDE_PLUGIN_ROOT}"),
+    ("slash", "/"),
+)
+
+if ahocorasick is not None:
+    _COMMAND_AUTOMATON = ahocorasick.Automaton()
+    for _tag, _keyword in _COMMAND_KEYWORDS:
+        _COMMAND_AUTOMATON.add_word(_keyword, _tag)
+    _COMMAND_AUTOMATON.make_automaton()
+
+    def _scan_command(command: str) -> "frozenset[str]":
+        return frozenset(tag for _, tag in _COMMAND_AUTOMATON.iter(command))
+else:
+
+    def _scan_command(command: str) -> "frozenset[str]":
+        return frozenset(tag for tag, keyword in _COMMAND_KEYWORDS if keyword in command)
+
+DANGEROUS_PATTERNS: List[Tuple[str, str]] = [
+    (r"rm\s+-[a-z]*f[a-z]*\s+[/~]", "Recursive/forced delete of an absolute or home path"),
+    (r"curl.*\|\s*(?:ba|z)?sh\b", "Piping a download straight into a shell"),
+    (r"\bsudo\b", "Hooks should not need elevated privileges"),
+    (r"\beval\b", "eval on hook input is an injection risk"),
+]
+
+# One alternation so every command is classified in a single scan instead
+# of one regex-engine invocation per pattern. Each alternative is exactly
+# one capturing group, so m.lastindex maps a match back to its message.
+DANGER_RE = re.compile(
+    "|".join(f"(?P<g{i}>{pattern})" for i, (pattern, _) in enumerate(DANGEROUS_PATTERNS)),
+    re.IGNORECASE,
+)
+DANGER_MESSAGES: List[str] = [message for _, message in DANGEROUS_PATTERNS]
+
+# Files larger than this are stream-parsed event-by-event (when ijson is
+# available) instead of materializing the whole tree with json.loads.
+STREAM_THRESHOLD = 256 * 1024
+
+# Cache schema version — bump whenever validation semantics change so
+# stale verdicts from older script versions are never reused.
+CACHE_SCHEMA = b"10"
+
+
+class ValidationError(NamedTuple):
+    level: str
+    message: str
+    path: str = ""
+
+
+# Level-specialized constructors so call sites don't re-pass the level
+# string on every finding.
+_err = partial(ValidationError, "error")
+_warn = partial(ValidationError, "warning")
+_info = partial(ValidationError, "info")
+
+_PREFIX: Dict[str, str] = {"error": "❌", "warning": "⚠️ ", "info": "ℹ️ "}
+
+
+def format_error(error: ValidationError) -> str:
+    location = f" ({error.path})" if error.path else ""
+    return f"{_PREFIX[error.level]} {error.message}{location}"
+
+
+class ValidationCache:
+    """Disk-backed verdict cache keyed by content digest.
+
+    CI validates the same unchanged settings files over and over; a hit
+    skips the parse and every validator pass. Only complete runs are
+    cached, and the key mixes in CACHE_SCHEMA plus VALID_EVENTS so any
+    change to the rules invalidates old entries automatically.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".cache", "ichiba-hook-validate"
+        )
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        tag = b"|" + CACHE_SCHEMA + b"|" + _VALID_EVENTS_STR.encode()
+        return hashlib.sha256(data + tag).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[ValidationError]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entries = json.load(f)
+            return [ValidationError(**entry) for entry in entries]
+        except (OSError, ValueError, TypeError):
+            # Missing or corrupt entry — treat as a miss.
+            return None
+
+    def set(self, key: str, errors: List[ValidationError]) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump([e._asdict() for e in errors], f)
+        except OSError:
+            # Cache writes are best-effort; validation already succeeded.
+            pass
+
+
+def validate_json_syntax(data: bytes) -> Tuple[Optional[Dict[str, Any]], List[ValidationError]]:
+    errors: List[ValidationError] = []
+    try:
+        config = _loads(data)
+    # orjson.JSONDecodeError and json.JSONDecodeError both subclass ValueError
+    except ValueError as e:
+        errors.append(_err(f"Invalid JSON: {e}"))
+        return None, errors
+    if not isinstance(config, dict):
+        errors.append(_err("Top-level value must be an object"))
+        return None, errors
+    return config, errors
+
+
+class _FirstError(Exception):
+    """Raised to abort the walk at the first error-level finding."""
+
+    def __init__(self, error: ValidationError):
+        super().__init__(format_error(error))
+        self.error = error
+
+
+def _raise_if_error(errors: List[ValidationError], start: int = 0) -> None:
+    for error in errors[start:]:
+        if error.level == "error":
+            raise _FirstError(error)
+
+
+def validate_event_pair(event_name: str, matchers: Any, errors: List[ValidationError]) -> None:
+    if event_name not in VALID_EVENTS:
+        errors.append(
+            _err(
+                f"Unknown event '{event_name}'. Valid events: {_VALID_EVENTS_STR}",
+                f"hooks.{event_name}",
+            )
+        )
+    elif not isinstance(matchers, list):
+        errors.append(
+            _err("Event value must be an array of matcher objects", f"hooks.{event_name}")
+        )
+
+
+def validate_event_names(config: Dict[str, Any]) -> List[ValidationError]:
+    errors: List[ValidationError] = []
+    hooks = config.get("hooks", {})
+    if not hooks:
+        errors.append(_warn("No hooks defined"))
+        return errors
+    if not isinstance(hooks, dict):
+        errors.append(_err('"hooks" must be an object', "hooks"))
+        return errors
+    for event_name, matchers in hooks.items():
+        validate_event_pair(event_name, matchers, errors)
+    return errors
+
+
+# A record per matcher object (hook is None, hook_idx is None) followed by
+# a record per hook entry. Every per-record check below consumes these, so
+# the nested hooks → matchers → hooks[] structure is traversed exactly once
+# per run instead of once per validator, and each path string is built
+# exactly once from its enclosing prefix.
+class HookRecord(NamedTuple):
+    event_name: str
+    matcher_idx: int
+    hook_idx: Optional[int]
+    matcher: Any
+    hook: Any
+    path: str
+
+
+def iter_event_hooks(event_name: str, matchers: Any) -> Iterator[HookRecord]:
+    if event_name not in VALID_EVENTS or not isinstance(matchers, list):
+        return
+    event_prefix = f"hooks.{event_name}"
+    for idx, matcher_obj in enumerate(matchers):
+        matcher_path = f"{event_prefix}[{idx}]"
+        # Non-dict entries still get a record so check_matcher can flag them.
+        yield HookRecord(event_name, idx, None, matcher_obj, None, matcher_path)
+        if not isinstance(matcher_obj, dict):
+            continue
+        hook_list = matcher_obj.get("hooks")
+        if not isinstance(hook_list, list):
+            continue
+        for hook_idx, hook in enumerate(hook_list):
+            yield HookRecord(
+                event_name, idx, hook_idx, matcher_obj, hook, f"{matcher_path}.hooks[{hook_idx}]"
+            )
+
+
+def iter_hooks(config: Dict[str, Any]) -> Iterator[HookRecord]:
+    hooks = config.get("hooks", {})
+    if not isinstance(hooks, dict):
+        return
+    for event_name, matchers in hooks.items():
+        yield from iter_event_hooks(event_name, matchers)
+
+
+def check_matcher(event_name: str, matcher_obj: Any, path: str, errors: List[ValidationError]) -> None:
+    if not isinstance(matcher_obj, dict):
+        errors.append(_err("Matcher entry must be an object", path))
+        return
+    if event_name in MATCHER_REQUIRED and "matcher" not in matcher_obj:
+        errors.append(
+            _warn(f"'{event_name}' matcher omits \"matcher\" (matches everything)", path)
+        )
+    if event_name in NO_MATCHER and matcher_obj.get("matcher"):
+        errors.append(_warn(f"'{event_name}' ignores \"matcher\"", path))
+    hook_list = matcher_obj.get("hooks")
+    if not isinstance(hook_list, list) or not hook_list:
+        errors.append(_err('Matcher must have a non-empty "hooks" array', path))
+
+
+def check_hook_structure(hook: Dict[str, Any], path: str, errors: List[ValidationError]) -> None:
+    hook_type: Any = hook.get("type")
+    if hook_type not in VALID_TYPES:
+        errors.append(
+            _err(f"Invalid hook type '{hook_type}'. Valid types: {_VALID_TYPES_STR}", path)
+        )
+    command: Any = hook.get("command")
+    if not isinstance(command, str) or not command:
+        errors.append(_err('"command" must be a non-empty string', path))
+    timeout: Any = hook.get("timeout")
+    # bool subclasses int, so "timeout": true would otherwise pass as 1
+    if timeout is not None and (
+        isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+    ):
+        errors.append(_err('"timeout" must be a positive number', f"{path}.timeout"))
+
+
+def check_file_paths(command: str, hits: "frozenset[str]", path: str, errors: List[ValidationError]) -> None:
+    if command.startswith(_REL_PREFIXES):
+        errors.append(
+            _warn(
+                "Relative script path depends on the working directory; "
+                "prefer $CLAUDE_PROJECT_DIR or $CLAUDE_PLUGIN_ROOT",
+                path,
+            )
+        )
+    elif "slash" in hits and "env" not in hits:
+        errors.append(
+            _info("Command uses a path without $CLAUDE_PROJECT_DIR or $CLAUDE_PLUGIN_ROOT", path)
+        )
+
+
+def check_security(command: str, path: str, errors: List[ValidationError]) -> None:
+    seen: Set[int] = set()
+    for m in DANGER_RE.finditer(command):
+        idx: int = m.lastindex - 1
+        if idx not in seen:
+            seen.add(idx)
+            errors.append(_warn(DANGER_MESSAGES[idx], path))
+
+
+def check_stop_hook(event_name: str, hits: "frozenset[str]", path: str, errors: List[ValidationError]) -> None:
+    if event_name in STOP_EVENTS and "stop_guard" not in hits:
+        errors.append(
+            _warn(f"'{event_name}' hook does not check stop_hook_active; it can loop forever", path)
+        )
+
+
+def check_record(record: HookRecord, errors: List[ValidationError]) -> None:
+    if record.hook_idx is None:
+        check_matcher(record.event_name, record.matcher, record.path, errors)
+        return
+    hook = record.hook
+    if not isinstance(hook, dict):
+        errors.append(_err("Hook entry must be an object", record.path))
+        return
+    check_hook_structure(hook, record.path, errors)
+    command = hook.get("command")
+    if isinstance(command, str):
+        hits = _scan_command(command)
+        check_file_paths(command, hits, record.path, errors)
+        check_security(command, record.path, errors)
+        check_stop_hook(record.event_name, hits, record.path, errors)
+
+
+def _check_records(records: List[HookRecord]) -> List[ValidationError]:
+    errors: List[ValidationError] = []
+    for record in records:
+        check_record(record, errors)
+    return errors
+
+
+def validate_config(config: Dict[str, Any], jobs: int = 1, fail_fast: bool = False) -> List[ValidationError]:
+    errors = validate_event_names(config)
+    # Nothing to walk — the "No hooks defined" warning (or the shape
+    # error) is already recorded, so skip the walker and, with --jobs,
+    # the executor setup entirely.
+    if not config.get("hooks"):
+        return errors
+    if fail_fast:
+        _raise_if_error(errors)
+        for record in iter_hooks(config):
+            n = len(errors)
+            check_record(record, errors)
+            _raise_if_error(errors, n)
+        return errors
+    if jobs <= 1:
+        for record in iter_hooks(config):
+            check_record(record, errors)
+        return errors
+    # The per-record checks are pure, so the walk can be partitioned into
+    # contiguous chunks; collecting in submit order keeps output stable.
+    records = list(iter_hooks(config))
+    workers = min(jobs, os.cpu_count() or 1)
+    chunk = -(-len(records) // workers) if records else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_check_records, records[i : i + chunk])
+            for i in range(0, len(records), chunk)
+        ]
+        for future in futures:
+            errors.extend(future.result())
+    return errors
+
+
+def validate_stream(data: bytes, fail_fast: bool = False) -> List[ValidationError]:
+    """Validate event-by-event without materializing the parsed tree.
+
+    The raw bytes are already in memory for cache keying; what this path
+    avoids is the full parsed-object tree, which dwarfs the bytes for
+    large merged settings files. Sequential by design — events arrive one
+    at a time, so there is nothing to partition across workers.
+    """
+    errors: List[ValidationError] = []
+    saw_hooks = False
+    try:
+        # kvitems yields nothing for a non-object root or a non-object
+        # "hooks" value, which would both read as "no hooks"; walk the
+        # parse events far enough to check those shapes so the streaming
+        # and json.loads paths agree.
+        events = ijson.parse(io.BytesIO(data))
+        first_event = next(events, None)
+        if first_event is None or first_event[1] != "start_map":
+            return [_err("Top-level value must be an object")]
+        for prefix, event, _value in events:
+            if prefix == "hooks":
+                if event != "start_map":
+                    return [_err('"hooks" must be an object', "hooks")]
+                break
+        for event_name, matchers in ijson.kvitems(io.BytesIO(data), "hooks"):
+            saw_hooks = True
+            validate_event_pair(event_name, matchers, errors)
+            if fail_fast:
+                _raise_if_error(errors)
+            for record in iter_event_hooks(event_name, matchers):
+                n = len(errors)
+                check_record(record, errors)
+                if fail_fast:
+                    _raise_if_error(errors, n)
+    except ijson.JSONError as e:
+        return [_err(f"Invalid JSON: {e}")]
+    if not saw_hooks:
+        errors.append(_warn("No hooks defined"))
+    return errors
+
+
+def validate_file(
+    file_path: str,
+    cache: ValidationCache,
+    use_cache: bool,
+    jobs: int = 1,
+    fail_fast: bool = False,
+) -> List[ValidationError]:
+    """Run the full pipeline (cache, parse, fused walk) for one file."""
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return [_err(f"Cannot read {file_path}: {e}")]
+
+    key = ValidationCache.key_for(data)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    try:
+        if ijson is not None and len(data) > STREAM_THRESHOLD:
+            errors = validate_stream(data, fail_fast=fail_fast)
+        else:
+            config, errors = validate_json_syntax(data)
+            if config is not None:
+                errors.extend(validate_config(config, jobs=jobs, fail_fast=fail_fast))
+    except _FirstError as stop:
+        # Aborted run — never cached.
+        return [stop.error]
+
+    if use_cache:
+        cache.set(key, errors)
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="hook configuration file(s) to validate")
+    parser.add_argument(
+        "--glob", dest="glob_pattern", metavar="PATTERN",
+        help="also validate every file matching PATTERN (amortizes startup across a repo)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="skip the on-disk verdict cache")
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="run per-record checks across N worker threads (default: 1)",
+    )
+    parser.add_argument(
+        "--fail-fast", action="store_true",
+        help="stop at the first error instead of reporting everything (skips the cache)",
+    )
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.glob_pattern:
+        files.extend(sorted(glob.glob(args.glob_pattern, recursive=True)))
+    if not files:
+        parser.error("no files to validate")
+
+    # An aborted run is incomplete by definition, so fail-fast mode never
+    # reads or writes the verdict cache.
+    use_cache = not args.no_cache and not args.fail_fast
+    cache = ValidationCache()
+
+    if len(files) == 1:
+        all_errors = validate_file(
+            files[0], cache, use_cache, jobs=args.jobs, fail_fast=args.fail_fast
+        )
+        for error in all_errors:
+            print(format_error(error))
+        if any(e.level == "error" for e in all_errors):
+            return 1
+        print(f"✅ {files[0]} is valid")
+        return 0
+
+    # Batch mode: one process, one thread per file (capped). Results come
+    # back via executor.map, so output order matches the argument order.
+    workers = min(len(files), args.jobs if args.jobs > 1 else (os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda f: validate_file(f, cache, use_cache, fail_fast=args.fail_fast),
+                files,
+            )
+        )
+
+    failed = 0
+    for file_path, errors in zip(files, results):
+        for error in errors:
+            print(f"{file_path}: {format_error(error)}")
+        if any(e.level == "error" for e in errors):
+            failed += 1
+    total = len(files)
+    if failed:
+        print(f"❌ {total - failed}/{total} valid, {failed} failed")
+        return 1
+    print(f"✅ {total}/{total} valid")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())